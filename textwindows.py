@@ -26,25 +26,52 @@
 #
 # Imported Modules:                                                          --
 #   - curses: Provides functions to create text-based user interfaces.       --
+#   - os: Used to set the curses ESCDELAY before the screen is initialized.  --
+#   - re: Used to split long lines into display-width chunks.                --
 #   - traceback: Used for generating and formatting stack trace information  --
 #                when exceptions occur.                                      --
-#   - datetime: Used for creating timestamps for messages displayed in the   --
-#               TextWindow and TextPad.                                      --
-#   - time: Provides time-related functions used in error handling.          --
-#   - sys: Provides access to system-specific parameters and functions,      --
-#          used in error handling to exit the program gracefully.            --
-#   - inspect: Used to get information about the current stack frame to      --
-#              determine the calling function in the error handler.          --
+#   - time: Used for creating timestamps for messages displayed in the       --
+#           TextWindow and TextPad, and in the demo's pacing.                --
+#   - sys: Used to get the calling function's frame in the error handler.    --
 #------------------------------------------------------------------------------
 
 import curses
+import os
+import re
 import traceback
-from datetime import datetime
 import time
 import sys
-import inspect
 
 
+class _ColorPairCache(dict):
+    # A pair that was not cached up front is looked up on first use and kept
+    def __missing__(self, Pair):
+        Value = self[Pair] = curses.color_pair(Pair)
+        return Value
+
+
+# Attribute values by color pair number, filled in by CacheColorPairs() once
+# curses.start_color() has been called
+_PAIRS = _ColorPairCache()
+
+
+def CacheColorPairs():
+    # Look up the color pairs once so print calls can index a dict. Only 256
+    # pairs fit in a character attribute; the rest are looked up on demand.
+    _PAIRS.update((i, curses.color_pair(i)) for i in range(min(curses.COLOR_PAIRS, 256)))
+
+
+# (second, "HH:MM:SS") of the last timestamp formatted by _GetTimeStamp()
+_TimeStampCache = (0, "")
+
+
+def _GetTimeStamp():
+    # Format the current time, reusing the string while the second is the same
+    global _TimeStampCache
+    Now = int(time.time())
+    if _TimeStampCache[0] != Now:
+        _TimeStampCache = (Now, time.strftime("%H:%M:%S", time.localtime(Now)))
+    return _TimeStampCache[1]
 
 
 class TextWindow(object):
@@ -69,107 +96,173 @@ class TextWindow(object):
             self.window = curses.newwin(self.rows, self.columns, self.y1, self.x1)
         except curses.error:
             raise ValueError("Failed to create a new window. Check if terminal size is sufficient.")
-        
-        self.CurrentRow = 1
-        self.StartColumn = 1
+
+        if not _PAIRS:
+            CacheColorPairs()
+
+        self.CurrentRow = 0
+        self.StartColumn = 0
         self.DisplayRows = self.rows  # We will modify this later, based on if we show borders or not
         self.DisplayColumns = self.columns  # We will modify this later, based on if we show borders or not
-        self.PreviousLineText = ""
-        self.PreviousLineRow = 0
-        self.PreviousLineColor = 2
         self.Title = ""
         self.TitleColor = TitleColor
+        self.TitleText = None  # the Title that TitleBytes was encoded from
+        self.TitleBytes = b""
 
         if self.ShowBorder == 'Y':
-            self.CurrentRow = 1
-            self.StartColumn = 1
             self.DisplayRows = self.rows - 2
             self.DisplayColumns = self.columns - 2
-            self.window.attron(curses.color_pair(BorderColor))
-            self.window.border()
-            self.window.attroff(curses.color_pair(BorderColor))
+            if self.DisplayRows <= 0 or self.DisplayColumns <= 0:
+                raise ValueError("Window is too small to show text inside its border. Please make it larger.")
+            self.DrawBorder()
+            # Text goes to a derived window inside the border, so printing and
+            # clearing never touch the border cells
+            self.inner = self.window.derwin(self.DisplayRows, self.DisplayColumns, 1, 1)
         else:
-            self.CurrentRow = 0
-            self.StartColumn = 0
+            self.inner = self.window
 
-    def ScrollPrint(self, PrintLine, Color=2, TimeStamp=False, BoldLine=True):
-        current_time = datetime.now().strftime("%H:%M:%S")
+        # ScrollPrint writes into this off-screen history buffer and refresh
+        # copies the newest DisplayRows rows into the window. The spare column
+        # keeps full-width lines from ever writing the pad's last cell.
+        self.BufferRows = max(self.DisplayRows * 4, 256)
+        try:
+            self.Buffer = curses.newpad(self.BufferRows, self.DisplayColumns + 1)
+        except curses.error:
+            raise ValueError("Failed to create the history buffer. Check if terminal size is sufficient.")
 
+        self.BlankLine = ' ' * self.DisplayColumns
+        # Matches up to one display row of text, so findall() does the wrapping.
+        # SplitLine breaks on newlines first, so none reach the pattern.
+        self.WrapPattern = re.compile(rf".{{1,{self.DisplayColumns}}}")
+
+    def SplitLine(self, PrintLine, TimeStamp=False):
+        # Split a line into display-width chunks, one per row, all padded
         if TimeStamp:
-            PrintLine = current_time + ": {}".format(PrintLine)
+            PrintLine = f"{_GetTimeStamp()}: {PrintLine}"
+
+        # Most lines have no tabs, so skip the copy expandtabs() would make
+        if '\t' in PrintLine:
+            PrintLine = PrintLine.expandtabs(4)
+
+        # Break on embedded newlines first so every chunk is exactly one row
+        chunks = []
+        for Line in PrintLine.split('\n'):
+            LineChunks = self.WrapPattern.findall(Line) or ['']
+            # Only the last chunk of a line can be short; pad it from the
+            # cached blank row
+            LineChunks[-1] += self.BlankLine[len(LineChunks[-1]):]
+            chunks.extend(LineChunks)
+        return chunks
 
-        PrintLine = PrintLine.expandtabs(4)
-        PrintableString = PrintLine[0:self.DisplayColumns]
-        RemainingString = PrintLine[self.DisplayColumns:]
+    def ScrollPrint(self, PrintLine, Color=2, TimeStamp=False, BoldLine=True):
+        DC = self.DisplayColumns
+        chunks = self.SplitLine(PrintLine, TimeStamp)
 
         try:
-            while len(PrintableString) > 0:
-                PrintableString = PrintableString.ljust(self.DisplayColumns, ' ')
-                self.window.attron(curses.color_pair(self.PreviousLineColor))
-                self.window.addstr(self.PreviousLineRow, self.StartColumn, self.PreviousLineText)
-                self.window.attroff(curses.color_pair(self.PreviousLineColor))
-
-                if BoldLine:
-                    self.window.attron(curses.color_pair(Color))
-                    self.window.addstr(self.CurrentRow, self.StartColumn, PrintableString, curses.A_BOLD)
-                    self.window.attroff(curses.color_pair(Color))
-                else:
-                    self.window.attron(curses.color_pair(Color))
-                    self.window.addstr(self.CurrentRow, self.StartColumn, PrintableString)
-                    self.window.attroff(curses.color_pair(Color))
-
-                self.PreviousLineText = PrintableString
-                self.PreviousLineColor = Color
-                self.PreviousLineRow = self.CurrentRow
+            attr = _PAIRS[Color] | (curses.A_BOLD if BoldLine else 0)
+            for chunk in chunks:
+                if self.CurrentRow >= self.BufferRows:
+                    # History is full, drop the oldest row
+                    self.Buffer.move(0, 0)
+                    self.Buffer.deleteln()
+                    self.CurrentRow = self.BufferRows - 1
+                self.Buffer.addnstr(self.CurrentRow, self.StartColumn, chunk, DC, attr)
                 self.CurrentRow = self.CurrentRow + 1
 
-                PrintableString = RemainingString[0:self.DisplayColumns]
-                RemainingString = RemainingString[self.DisplayColumns:]
+        except Exception as ErrorMessage:
+            TraceMessage = traceback.format_exc()
+            AdditionalInfo = "PrintLine: {}".format(PrintLine)
+            self.ErrorHandler(ErrorMessage, TraceMessage, AdditionalInfo)
+
+    def ScrollPrintMany(self, PrintLines, Color=2, TimeStamp=False, BoldLine=True):
+        # Print several lines in the same color with a single addstr() call
+        chunks = []
+        for PrintLine in PrintLines:
+            chunks.extend(self.SplitLine(PrintLine, TimeStamp))
+        chunks = chunks[-self.BufferRows:]
+        if not chunks:
+            return
 
-            if self.CurrentRow > (self.DisplayRows):
-                if self.ShowBorder == 'Y':
-                    self.CurrentRow = 1
-                else:
-                    self.CurrentRow = 0
+        try:
+            attr = _PAIRS[Color] | (curses.A_BOLD if BoldLine else 0)
+
+            # Drop the oldest history rows if the block would not fit
+            Overflow = self.CurrentRow + len(chunks) - self.BufferRows
+            if Overflow > 0:
+                self.Buffer.move(0, 0)
+                self.Buffer.insdelln(-Overflow)
+                self.CurrentRow = self.CurrentRow - Overflow
+
+            # Chunks are exactly DisplayColumns wide, so the cursor sits in the
+            # buffer's spare column after each one and '\n' moves to the next row
+            self.Buffer.addstr(self.CurrentRow, self.StartColumn, '\n'.join(chunks), attr)
+            self.CurrentRow = self.CurrentRow + len(chunks)
 
         except Exception as ErrorMessage:
             TraceMessage = traceback.format_exc()
-            AdditionalInfo = "PrintLine: {}".format(PrintLine)
+            AdditionalInfo = "PrintLines: {}".format(PrintLines)
             self.ErrorHandler(ErrorMessage, TraceMessage, AdditionalInfo)
 
+    def DrawBorder(self):
+        # Bake the border color into the line characters so border() is one call
+        Pair = _PAIRS[self.BorderColor]
+        self.window.border(
+            curses.ACS_VLINE | Pair, curses.ACS_VLINE | Pair,
+            curses.ACS_HLINE | Pair, curses.ACS_HLINE | Pair,
+            curses.ACS_ULCORNER | Pair, curses.ACS_URCORNER | Pair,
+            curses.ACS_LLCORNER | Pair, curses.ACS_LRCORNER | Pair
+        )
+
     def DisplayTitle(self):
         try:
-            Title = self.Title[0:self.DisplayColumns - 3]
-            self.window.attron(curses.color_pair(self.TitleColor))
+            # Encode the title once and reuse the bytes until it changes
+            if self.Title != self.TitleText:
+                self.TitleText = self.Title
+                self.TitleBytes = self.Title[0:self.DisplayColumns - 3].encode(self.window.encoding, 'replace')
             if self.rows > 2:
-                self.window.addstr(0, 2, Title)
+                self.window.addstr(0, 2, self.TitleBytes, _PAIRS[self.TitleColor])
             else:
                 print("ERROR - You cannot display title on a window smaller than 3 rows")
-            self.window.attroff(curses.color_pair(self.TitleColor))
 
         except Exception as ErrorMessage:
             TraceMessage = traceback.format_exc()
-            AdditionalInfo = "Title: " + Title
+            AdditionalInfo = "Title: " + self.Title
             self.ErrorHandler(ErrorMessage, TraceMessage, AdditionalInfo)
 
     def Clear(self):
-        self.window.erase()
-        self.window.attron(curses.color_pair(self.BorderColor))
-        self.window.border()
-        self.window.attroff(curses.color_pair(self.BorderColor))
-        self.DisplayTitle()
+        # Only the history buffer is blanked. The next refresh copies the
+        # blank rows into the window; the border and title are left alone.
+        self.Buffer.erase()
+        self.CurrentRow = 0
+
+    def HandleResize(self):
+        # Call after KEY_RESIZE. The terminal has been cleared, so redraw the
+        # border and title and mark every cell for the next refresh.
         if self.ShowBorder == 'Y':
-            self.CurrentRow = 1
-            self.StartColumn = 1
-        else:
-            self.CurrentRow = 0
-            self.StartColumn = 0
+            self.DrawBorder()
+        if self.Title:
+            self.DisplayTitle()
+        self.window.touchwin()
+
+    def noutrefresh(self):
+        # Copy the newest rows of the history buffer into the window. copywin
+        # only marks cells that differ, so unchanged rows stay clean.
+        Top = max(self.CurrentRow - self.DisplayRows, 0)
+        self.Buffer.overwrite(self.inner, Top, 0, 0, 0, self.DisplayRows - 1, self.DisplayColumns - 1)
+
+        # Stage the window for the next flush() without writing to the terminal.
+        # The inner window tracks its own changes, so it is staged separately.
+        self.window.noutrefresh()
+        if self.inner is not self.window:
+            self.inner.noutrefresh()
 
     def refresh(self):
-        self.window.refresh()
+        self.noutrefresh()
+        flush()
 
     def ErrorHandler(self, ErrorMessage, TraceMessage, AdditionalInfo):
-        print("ERROR - An error occurred in TextWindow class.")
+        CallingFunction = sys._getframe(1).f_code.co_name
+        print("ERROR - An error occurred in TextWindow." + CallingFunction)
         print(ErrorMessage)
         print("TRACE")
         print(TraceMessage)
@@ -197,39 +290,49 @@ class TextPad(object):
             self.pad = curses.newpad(self.rows, self.columns)
         except curses.error:
             raise ValueError("Failed to create a new pad. Check if terminal size is sufficient.")
-        self.PreviousLineColor = 2
+        self.pad.idlok(True)
+        self.pad.scrollok(True)
+
+        if not _PAIRS:
+            CacheColorPairs()
+        self.BlankLine = ' ' * (self.columns - 1)
+        self.Rect = self.ComputeRect()  # refresh area, updated by HandleResize()
 
     def PadPrint(self, PrintLine, Color=2, TimeStamp=False):
         # Print to the pad
         try:
-            self.pad.idlok(1)
-            self.pad.scrollok(1)
-
-            current_time = datetime.now().strftime("%H:%M:%S")
             if TimeStamp:
-                PrintLine = current_time + ": " + PrintLine
+                PrintLine = f"{_GetTimeStamp()}: {PrintLine}"
 
-            # Expand tabs to X spaces
-            PrintLine = PrintLine.expandtabs(4)
-            # Pad the string with space then truncate
-            PrintLine = PrintLine.ljust(self.columns, ' ')
-            PrintLine = PrintLine[:self.columns - 1]  # Truncate to fit
+            # Expand tabs to X spaces, skipping the copy when there are none
+            if '\t' in PrintLine:
+                PrintLine = PrintLine.expandtabs(4)
+            # Truncate to fit then pad with spaces from the cached blank row
+            PrintLine = PrintLine[:self.columns - 1]
+            PrintLine += self.BlankLine[len(PrintLine):]
 
-            self.pad.attron(curses.color_pair(Color))
-            self.pad.addstr(PrintLine + '\n')
-            self.pad.attroff(curses.color_pair(Color))
+            self.pad.addstr(PrintLine + '\n', _PAIRS[Color])
 
             # Do not refresh here
             # self.refresh()
 
+        except curses.error as ErrorMessage:
+            # Writing the pad's bottom-right cell makes curses report an error
+            # after the text has already been drawn; anything else is real
+            CursorY, CursorX = self.pad.getyx()
+            MaxY, MaxX = self.pad.getmaxyx()
+            if (CursorY, CursorX) != (MaxY - 1, MaxX - 1):
+                TraceMessage = traceback.format_exc()
+                AdditionalInfo = "PrintLine: " + PrintLine
+                self.ErrorHandler(ErrorMessage, TraceMessage, AdditionalInfo)
+
         except Exception as ErrorMessage:
-            time.sleep(2)
             TraceMessage = traceback.format_exc()
             AdditionalInfo = "PrintLine: " + PrintLine
             self.ErrorHandler(ErrorMessage, TraceMessage, AdditionalInfo)
 
-    def refresh(self):
-        # Calculate the refresh area
+    def ComputeRect(self):
+        # Calculate the refresh area, clipped to the current terminal size
         max_y, max_x = curses.LINES - 1, curses.COLS - 1
         pad_max_y, pad_max_x = self.ypos + self.height - 1, self.xpos + self.width - 1
 
@@ -238,12 +341,46 @@ class TextPad(object):
         refresh_y2 = min(pad_max_y, max_y)
         refresh_x2 = min(pad_max_x, max_x)
 
-        self.pad.refresh(
+        return (
             0, 0,
             refresh_y1, refresh_x1,
             refresh_y2, refresh_x2
         )
 
+    def HandleResize(self):
+        # Call after KEY_RESIZE (and curses.update_lines_cols()) to re-clip
+        # and repaint the pad on the cleared terminal
+        self.Rect = self.ComputeRect()
+        self.pad.touchwin()
+
+    def noutrefresh(self):
+        # Stage the pad for the next flush() without writing to the terminal
+        self.pad.noutrefresh(*self.Rect)
+
+    def refresh(self):
+        self.noutrefresh()
+        flush()
+
+    def PadEcho(self, PrintLine, Color=2):
+        # Show PrintLine on the current pad row without advancing, so the next
+        # PadEcho or PadPrint overwrites it
+        try:
+            Row = self.pad.getyx()[0]
+
+            # Keep the end of the line visible, where the user is typing
+            if '\t' in PrintLine:
+                PrintLine = PrintLine.expandtabs(4)
+            PrintLine = PrintLine[max(len(PrintLine) - (self.columns - 1), 0):]
+            PrintLine += self.BlankLine[len(PrintLine):]
+
+            self.pad.addstr(Row, 0, PrintLine, _PAIRS[Color])
+            self.pad.move(Row, 0)
+
+        except Exception as ErrorMessage:
+            TraceMessage = traceback.format_exc()
+            AdditionalInfo = "PrintLine: " + PrintLine
+            self.ErrorHandler(ErrorMessage, TraceMessage, AdditionalInfo)
+
     def Clear(self):
         try:
             self.pad.erase()
@@ -254,7 +391,8 @@ class TextPad(object):
             self.ErrorHandler(ErrorMessage, TraceMessage, AdditionalInfo)
 
     def ErrorHandler(self, ErrorMessage, TraceMessage, AdditionalInfo):
-        print("ERROR - An error occurred in TextPad class.")
+        CallingFunction = sys._getframe(1).f_code.co_name
+        print("ERROR - An error occurred in TextPad." + CallingFunction)
         print(ErrorMessage)
         print("TRACE")
         print(TraceMessage)
@@ -262,11 +400,18 @@ class TextPad(object):
             print("Additional info:", AdditionalInfo)
 
 
+def flush():
+    # Write every window staged with noutrefresh() to the terminal in one update
+    curses.doupdate()
+
+
 # Global variable to hold the typed text
 typed_text = ""
+# Set when typed_text changes; main repaints the echo line once per frame
+typed_text_dirty = False
 
 def PollKeyboard(stdscr):
-    # Get key press (polling)
+    # Get key press, waiting up to the stdscr timeout
     try:
         c = stdscr.getch()
         if c != curses.ERR:
@@ -278,7 +423,7 @@ def PollKeyboard(stdscr):
         return None
 
 def ProcessKeypress(c, pad):
-    global typed_text
+    global typed_text, typed_text_dirty
 
     try:
         if c == 27:  # Escape key to exit
@@ -292,11 +437,10 @@ def ProcessKeypress(c, pad):
             typed_text = typed_text[:-1]
 
         elif 0 <= c <= 255:
-            typed_text = chr(c)
+            typed_text += chr(c)
 
-        # Display the currently typed text in the pad
-        pad.PadPrint(f"{typed_text}", Color=6)
-        pad.refresh()
+        # The echo line is redrawn by main at most once per frame
+        typed_text_dirty = True
 
         return None
 
@@ -305,11 +449,13 @@ def ProcessKeypress(c, pad):
         return None
 
 def main(stdscr):
+    global typed_text_dirty
+
     # Initialize curses
     curses.noecho()
     curses.cbreak()
     curses.curs_set(0)
-    stdscr.nodelay(1)  # Non-blocking input
+    stdscr.timeout(33)  # Block getch() for up to one frame (~30 FPS)
     stdscr.keypad(1)
     
     # Initialize colors
@@ -321,69 +467,96 @@ def main(stdscr):
     curses.init_pair(5, curses.COLOR_MAGENTA, curses.COLOR_BLACK)
     curses.init_pair(6, curses.COLOR_CYAN, curses.COLOR_BLACK)
     curses.init_pair(7, curses.COLOR_WHITE, curses.COLOR_BLACK)
+    CacheColorPairs()
 
     
     curses.curs_set(0)
-    
+
+    # Flush the initial clear of stdscr now; otherwise the first getch()
+    # refreshes stdscr and blanks the windows drawn over it
+    stdscr.noutrefresh()
+
     # Create a TextWindow that will act as a container
     #(name, rows, columns, y1, x1, y2, x2, ShowBorder, BorderColor, TitleColor):
     window = TextWindow('StoryTime', rows=10, columns=42, y1=0, x1=0,  ShowBorder='Y', BorderColor=2, TitleColor=3)
     window2 = TextWindow('ContainerWindow', rows=10, columns=20, y1=0, x1=43, ShowBorder='Y', BorderColor=2, TitleColor=4)
-    window.refresh()
-    window2.refresh()
+    window.noutrefresh()
+    window2.noutrefresh()
+    flush()
 
     
     window.DisplayTitle()
-    window.ScrollPrint("This is a story all about how my life got flipped turned upside down.")
-    window.refresh()
-
-    window.ScrollPrint("One")
-    time.sleep(0.25)
-    window.refresh()
-    window.ScrollPrint("Two")
-    time.sleep(0.25)
-    window.refresh()
-    window.ScrollPrint("Three")
-    time.sleep(0.25)
-    window.refresh()
-    window.ScrollPrint("Four")
-    time.sleep(0.25)
-    window.refresh()
-    window.ScrollPrint("Five")
-    time.sleep(0.25)
-    window.refresh()
-    
-    
-    window2.ScrollPrint("One")
-    time.sleep(0.25)
-    window2.refresh()
-    window2.ScrollPrint("Two")
-    time.sleep(0.25)
-    window2.refresh()
-    window2.ScrollPrint("Three")
-    time.sleep(0.25)
-    window2.refresh()
-    window2.ScrollPrint("Four")
-    time.sleep(0.25)
-    window2.refresh()
-    window2.ScrollPrint("Five")
-    time.sleep(0.25)
-    window2.refresh()
-    
 
-
-    
-    window2.ScrollPrint("12345678901234567890")
-    window.refresh()
-    time.sleep(5)
-    window.refresh()
-    
-    # Create a TextPad inside the TextWindow with some offsets
+    # Paint the first window's opening lines in one call
+    window.ScrollPrintMany([
+        "This is a story all about how my life got flipped turned upside down.",
+        "One",
+        "Two",
+        "Three",
+        "Four",
+        "Five",
+    ])
+
+    # Each event is printed on its own frame. Frames are paced against a
+    # deadline, so the time spent printing and flushing comes out of the
+    # sleep instead of being added to it.
+    Events = [
+        (window2, "One"),
+        (window2, "Two"),
+        (window2, "Three"),
+        (window2, "Four"),
+        (window2, "Five"),
+        (window2, "12345678901234567890"),
+    ]
+    FrameTime = 0.25
+    Deadline = time.monotonic()
+    for Target, Text in Events:
+        Target.ScrollPrint(Text)
+        window.noutrefresh()
+        window2.noutrefresh()
+        flush()
+        Deadline += FrameTime
+        time.sleep(max(Deadline - time.monotonic(), 0))
+
+    # Create a TextPad below the windows to echo keyboard input
     #(name, rows, columns, y1, x1, y2, x2, ShowBorder, BorderColor):
-    #pad = TextPad(name='TestPad', rows=10, columns=10, y1=10, x1=10, y2=20, x2=20, ShowBorder='Y',BorderColor=4)
-    #pad.PadPrint("This is a text printed inside the pad within a window.", Color=5, TimeStamp=True)
-    #pad.PadPrint("Another line inside the pad to show scrolling.", Color=6, TimeStamp=True)
-    #pad.refresh()
-
-    
+    pad = TextPad(name='InputPad', rows=10, columns=62, y1=11, x1=0, y2=21, x2=62, ShowBorder='N', BorderColor=4)
+
+    # getch() waits up to one frame for a key, so the loop only wakes up to
+    # handle input or to finish a frame
+    EchoFrameTime = 0.033  # one frame, matching stdscr.timeout(33)
+    EchoDeadline = time.monotonic()
+    while True:
+        c = PollKeyboard(stdscr)
+        if c == curses.KEY_RESIZE:
+            curses.update_lines_cols()
+            window.HandleResize()
+            window2.HandleResize()
+            pad.HandleResize()
+            # Stage the resized stdscr first, as at startup, so the next
+            # getch() does not refresh it over the windows
+            stdscr.noutrefresh()
+            window.noutrefresh()
+            window2.noutrefresh()
+            pad.noutrefresh()
+            flush()
+        elif c is not None:
+            if ProcessKeypress(c, pad) == "EXIT":
+                break
+
+        # Echo everything typed since the last echo at most once per frame.
+        # This runs whether or not a key arrived, so autorepeat and pasted
+        # text keep the echo line moving.
+        Now = time.monotonic()
+        if typed_text_dirty and Now >= EchoDeadline:
+            pad.PadEcho(typed_text, Color=6)
+            pad.noutrefresh()
+            flush()
+            typed_text_dirty = False
+            EchoDeadline = Now + EchoFrameTime
+
+
+# Shorten the wait curses does after Escape to tell it apart from an escape
+# sequence. This has to be set before initscr(), which wrapper() calls.
+os.environ.setdefault('ESCDELAY', '25')
 curses.wrapper(main)
\ No newline at end of file